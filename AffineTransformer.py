@@ -14,7 +14,6 @@
 # -----------------------------------------------------------------------------------
 
 import numpy as np
-import cv2
 
 class AffineTransformer:
     """
@@ -36,22 +35,28 @@ class AffineTransformer:
         - m2_hor_points (np.array): Horizontal reference points from the second model used to calculate scaling.
         - m2_ver_points (np.array): Vertical reference points from the second model used to calculate scaling.
         """
-        self.scale_factor = self._get_scale_factor(
-            np.array(m1_hor_points),
-            np.array(m1_ver_points),
-            np.array(m2_hor_points),
-            np.array(m2_ver_points)
-        )
+        # Kept as a Python float so scaling doesn't promote float32 points to float64
+        self.scale_factor = float(self._get_scale_factor(
+            np.reshape(m1_hor_points, (2, 3)),
+            np.reshape(m1_ver_points, (2, 3)),
+            np.reshape(m2_hor_points, (2, 3)),
+            np.reshape(m2_ver_points, (2, 3))
+        ))
 
         scaled_m2_points = m2_points * self.scale_factor
 
-        retval, M, inliers = cv2.estimateAffine3D(m1_points, scaled_m2_points)
-        if retval:
-            self.success = True
-            self.transform_matrix = M
-        else:
-            self.success = False
-            self.transform_matrix = None
+        # The landmarks are clean correspondences, so the affine matrix is solved directly
+        # in the least squares sense instead of through RANSAC.
+        m1_points_homogeneous = np.hstack([m1_points, np.ones((len(m1_points), 1), dtype=m1_points.dtype)])
+        M_T, _, _, _ = np.linalg.lstsq(m1_points_homogeneous, scaled_m2_points, rcond=None)
+
+        self.success = True
+        self.transform_matrix = M_T.T
+        self.inverse_transform = np.linalg.inv(np.vstack([self.transform_matrix, np.array([0, 0, 0, 1], dtype=M_T.dtype)]))
+
+        # Scratch buffers for to_m2_batch, (re)allocated lazily when the number of points changes
+        self._h_scratch = None
+        self._out_scratch = None
 
     def _get_scale_factor(self, m1_hor_points, m1_ver_points, m2_hor_points, m2_ver_points):
         """
@@ -66,10 +71,14 @@ class AffineTransformer:
         Returns:
         - float: The calculated uniform scale factor to apply.
         """
-        m1_width = np.linalg.norm(m1_hor_points[0] - m1_hor_points[1])
-        m1_height = np.linalg.norm(m1_ver_points[0] - m1_ver_points[1])
-        m2_width = np.linalg.norm(m2_hor_points[0] - m2_hor_points[1])
-        m2_height = np.linalg.norm(m2_ver_points[0] - m2_ver_points[1])
+        diffs = np.array([
+            m1_hor_points[0] - m1_hor_points[1],
+            m1_ver_points[0] - m1_ver_points[1],
+            m2_hor_points[0] - m2_hor_points[1],
+            m2_ver_points[0] - m2_ver_points[1]
+        ])
+        # Widths and heights of both models in a single vectorized norm
+        m1_width, m1_height, m2_width, m2_height = np.sqrt(np.einsum('ij,ij->i', diffs, diffs))
         scale_width = m1_width / m2_width
         scale_height = m1_height / m2_height
         return (scale_width + scale_height) / 2
@@ -85,11 +94,35 @@ class AffineTransformer:
         - np.array or None: Transformed point in the second model's space if the transformation was successful; otherwise None.
         """
         if self.success:
-            m1_point_homogeneous = np.append(m1_point, 1)  # Convert to homogeneous coordinates
+            m1_point_homogeneous = np.append(m1_point, np.ones(1, dtype=self.transform_matrix.dtype))  # Convert to homogeneous coordinates
             return np.dot(self.transform_matrix, m1_point_homogeneous) / self.scale_factor
         else:
             return None
 
+    def to_m2_batch(self, m1_points):
+        """
+        Transforms an array of points from the first model space to the second model space in a single matrix product.
+
+        Args:
+        - m1_points (np.array): (N, 3) array of points in the first model's coordinate space.
+
+        Returns:
+        - np.array or None: (N, 3) array of transformed points in the second model's space if the transformation was successful; otherwise None.
+          The array is a scratch buffer that is overwritten by the next call, copy it if it needs to be kept.
+        """
+        if self.success:
+            n = len(m1_points)
+            if self._h_scratch is None or self._h_scratch.shape[0] != n:
+                self._h_scratch = np.empty((n, 4), dtype=self.transform_matrix.dtype)
+                self._h_scratch[:, 3] = 1.0  # Homogeneous coordinate, never overwritten
+                self._out_scratch = np.empty((n, 3), dtype=self.transform_matrix.dtype)
+            self._h_scratch[:, :3] = m1_points
+            np.dot(self._h_scratch, self.transform_matrix.T, out=self._out_scratch)
+            self._out_scratch /= self.scale_factor
+            return self._out_scratch
+        else:
+            return None
+
     def to_m1(self, m2_point):
         """
         Transforms a point from the second model space back to the first model space using the inverse of the affine transformation matrix.
@@ -101,12 +134,24 @@ class AffineTransformer:
         - np.array or None: Transformed point back in the first model's space if the transformation was successful; otherwise None.
         """
         if self.success:
-            affine_transform_4x4 = np.vstack([self.transform_matrix, [0, 0, 0, 1]])
-            inverse_affine_transform = np.linalg.inv(affine_transform_4x4)
-            m2_point_homogeneous = np.append(m2_point * self.scale_factor, 1)  # Convert to homogeneous coordinates
-            m1_point_homogeneous = np.dot(inverse_affine_transform, m2_point_homogeneous)
+            m2_point_homogeneous = np.append(m2_point * self.scale_factor, np.ones(1, dtype=self.inverse_transform.dtype))  # Convert to homogeneous coordinates
+            # The bottom row of the inverse is [0, 0, 0, 1], so no homogeneous divide is needed
+            return np.dot(self.inverse_transform, m2_point_homogeneous)[:3]
+        else:
+            return None
+
+    def to_m1_batch(self, m2_points):
+        """
+        Transforms an array of points from the second model space back to the first model space in a single matrix product.
 
-            # Convert back to non-homogeneous coordinates
-            return (m1_point_homogeneous[:3] / m1_point_homogeneous[3])
+        Args:
+        - m2_points (np.array): (N, 3) array of points in the second model's coordinate space.
+
+        Returns:
+        - np.array or None: (N, 3) array of transformed points back in the first model's space if the transformation was successful; otherwise None.
+        """
+        if self.success:
+            m2_points_homogeneous = np.hstack([m2_points * self.scale_factor, np.ones((len(m2_points), 1), dtype=self.inverse_transform.dtype)])
+            return m2_points_homogeneous @ self.inverse_transform[:3].T
         else:
             return None
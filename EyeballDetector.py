@@ -19,7 +19,6 @@
 
 
 import numpy as np
-from scipy.optimize import minimize
 import time
 
 class EyeballDetector:
@@ -42,18 +41,37 @@ class EyeballDetector:
         - points_history_size (int): Maximum size of the queue of collected points for calculating.
         - refresh_time_threshold (int): Time in milliseconds to refresh the detection state.
         """
-        self.eye_center = np.array(initial_eye_center)
+        self.eye_center = np.array(initial_eye_center, dtype=np.float32)
         self.eye_radius = initial_eye_radius
         self.min_confidence = min_confidence
         self.reasonable_confidence = reasonable_confidence
+        # Confidence is 1 / (1 + loss), so the thresholds are compared in loss space instead
+        self._max_loss_min = 1 / min_confidence - 1
+        self._max_loss_reasonable = 1 / reasonable_confidence - 1
         self.points_threshold = points_threshold
         self.points_history_size = points_history_size
         self.refresh_time_threshold = refresh_time_threshold
-        self.points_for_eye_center = None
-        self.current_confidence = 0.0
+        self._buf = np.empty((points_history_size, 3), dtype=np.float32)
+        self._head = 0
+        self._filled = 0
+        self.current_loss = np.inf
         self.center_detected = False
         self.search_completed = False
-        self.last_update_time = int(time.time() * 1000)
+        self.last_update_time = time.monotonic_ns() // 1_000_000
+
+    @property
+    def current_confidence(self):
+        """
+        Confidence of the current estimation, the inverse of its loss.
+        """
+        return 1 / (1 + self.current_loss)
+
+    @property
+    def points_for_eye_center(self):
+        """
+        Collected points for the eye center estimation, in ring buffer (not chronological) order.
+        """
+        return self._buf[:self._filled]
 
     def update(self, new_points, timestamp_ms):
         """
@@ -64,23 +82,24 @@ class EyeballDetector:
         - timestamp_ms (int): The current frame's timestamp in milliseconds.
         """
 
-        if self.points_for_eye_center is not None:
-            self.points_for_eye_center = np.concatenate((self.points_for_eye_center, new_points), axis=0)[-self.points_history_size:]
-        else:
-            self.points_for_eye_center = new_points
+        k = len(new_points)
+        idx = (self._head + np.arange(k)) % self.points_history_size
+        self._buf[idx] = new_points
+        self._head = (self._head + k) % self.points_history_size
+        self._filled = min(self._filled + k, self.points_history_size)
 
-        if len(self.points_for_eye_center) >= self.points_threshold and not self.search_completed:
-            center, radius, confidence = self._solve_for_sphere(self.points_for_eye_center)
+        if self._filled >= self.points_threshold and not self.search_completed:
+            center, radius, loss = self._solve_for_sphere(self.points_for_eye_center)
 
-            if confidence and confidence > self.current_confidence:
+            if loss < self.current_loss:
                 self.eye_center = center
                 self.eye_radius = radius
-                self.current_confidence = confidence
+                self.current_loss = loss
                 self.last_update_time = timestamp_ms
 
-                if confidence >= self.min_confidence:
+                if loss <= self._max_loss_min:
                     self.center_detected = True
-                if confidence >= self.reasonable_confidence:
+                if loss <= self._max_loss_reasonable:
                     self.search_completed = True  # Indicate that the search can be concluded
 
             # Reset detection if too much time has passed without an update
@@ -96,30 +115,65 @@ class EyeballDetector:
         - radius_bounds (tuple): Bounds for the sphere's radius (min_radius, max_radius).
 
         Returns:
-        - tuple: The center (x, y, z), radius of the sphere, and the confidence of the solution.
+        - tuple: The center (x, y, z), radius of the sphere, and the loss (sum of squared residuals) of the solution.
+        """
+        # Algebraic fit: |p|^2 = 2c.p + (R^2 - |c|^2) is linear in (2c, R^2 - |c|^2)
+        A = np.c_[points, np.ones(len(points), dtype=points.dtype)]
+        b = np.einsum('ij,ij->i', points, points)
+        solution, _, _, _ = np.linalg.lstsq(A, b, rcond=None)
+        center = solution[:3] / 2
+        radius = np.clip(np.sqrt(max(solution[3] + center @ center, 0)), *radius_bounds)
+
+        # The algebraic center is biased on small noisy caps, so it only seeds a geometric fit
+        center, radius = self._refit_sphere(points, center, radius, radius_bounds)
+
+        d = points - center
+        residuals = np.sqrt(np.einsum('ij,ij->i', d, d)) - radius
+        loss = residuals @ residuals
+        return center, radius, loss
+
+    def _refit_sphere(self, points, center, radius, radius_bounds, max_iterations=10, tolerance=1e-7):
+        """
+        Refines a sphere by Gauss-Newton steps on the geometric residuals, keeping the radius within bounds.
+        When a step would take the radius out of bounds, the radius is clamped and the center is re-solved for it.
+
+        Args:
+        - points (np.array): Array of points.
+        - center (np.array): Initial center (x, y, z).
+        - radius (float): Initial radius within radius_bounds.
+        - radius_bounds (tuple): Bounds for the sphere's radius (min_radius, max_radius).
+        - max_iterations (int): Maximum number of Gauss-Newton steps.
+        - tolerance (float): Step length at which the iteration stops.
+
+        Returns:
+        - tuple: The refined center (x, y, z) and radius of the sphere.
         """
-        def objective(params, points):
-            center, R = params[:3], params[3]
-            residuals = np.linalg.norm(points - center, axis=1) - R
-            return np.sum(residuals**2)
-
-        bounds = [(None, None), (None, None), (None, None), radius_bounds]
-        result = minimize(objective, np.append(self.eye_center, self.eye_radius), args=(points,), bounds=bounds)
-
-        if radius_bounds[0] <= result.x[3] <= radius_bounds[1]:
-            center = result.x[:3]
-            radius = result.x[3]
-            confidence = 1 / (1 + result.fun)  # Inverse of loss
-            return center, radius, confidence
-        else:
-            return None, None, None
+        for _ in range(max_iterations):
+            d = points - center
+            dist = np.sqrt(np.einsum('ij,ij->i', d, d))
+            # Residual r_i = |p_i - c| - R has the Jacobian [-(p_i - c) / |p_i - c|, -1]
+            J = np.c_[-d / dist[:, None], -np.ones(len(points), dtype=points.dtype)]
+            step, _, _, _ = np.linalg.lstsq(J, radius - dist, rcond=None)
+
+            if radius_bounds[0] <= radius + step[3] <= radius_bounds[1]:
+                center = center + step[:3]
+                radius = radius + step[3]
+            else:
+                radius = np.clip(radius + step[3], *radius_bounds)
+                step, _, _, _ = np.linalg.lstsq(J[:, :3], radius - dist, rcond=None)
+                center = center + step
+
+            if np.sqrt(step @ step) < tolerance:
+                break
+        return center.astype(points.dtype), radius
 
     def reset(self):
         """
         Resets the detector to initial values and states.
         """
-        self.points_for_eye_center = None
-        self.current_confidence = 0.0
+        self._head = 0
+        self._filled = 0
+        self.current_loss = np.inf
         self.center_detected = False
         self.search_completed = False
-        self.last_update_time = int(time.time() * 1000)
+        self.last_update_time = time.monotonic_ns() // 1_000_000
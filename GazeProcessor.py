@@ -13,6 +13,12 @@
 import mediapipe as mp
 import cv2
 import time
+import asyncio
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from numba import njit
 from landmarks import *
 from face_model import *
 from AffineTransformer import AffineTransformer
@@ -26,6 +32,22 @@ FaceLandmarker = mp.tasks.vision.FaceLandmarker
 FaceLandmarkerOptions = mp.tasks.vision.FaceLandmarkerOptions
 VisionRunningMode = mp.tasks.vision.RunningMode
 
+# Max per-coordinate motion of the base landmarks (normalized units) for reusing the previous head transform
+HEAD_POSE_EPSILON = 5e-4
+# Number of frames after which the head transform is rebuilt even if the head stays still
+TRANSFORM_REFRESH_FRAMES = 30
+
+# Explicit signature compiles the kernel eagerly at import instead of on the first tracked frame
+@njit('void(float32[:], float32[:], float64, float32[:], float32[:])', cache=True)
+def _gaze_and_proj(pupil, center, k, out_gaze, out_proj):
+    """
+    Writes the gaze vector (pupil - center) and its projection endpoint (pupil + k * gaze) into the output buffers.
+    """
+    for i in range(3):
+        g = pupil[i] - center[i]
+        out_gaze[i] = g
+        out_proj[i] = pupil[i] + g * k
+
 class GazeProcessor:
     """
     Processes video input to detect facial landmarks and estimate gaze vectors using the MediaPipe library.
@@ -38,7 +60,7 @@ class GazeProcessor:
 
         Args:
         - camera_idx (int): Index of the camera to be used for video capture.
-        - callback (function): Asynchronous callback function to output the gaze vectors.
+        - callback (function): Asynchronous callback function to output the gaze vectors (float32 arrays of shape (3,)).
         - visualization_options (object): Options for visual feedback on the video frame. Supports visualization options
         for calibration and tracking states.
         """
@@ -47,83 +69,225 @@ class GazeProcessor:
         self.vis_options = visualization_options
         self.left_detector = EyeballDetector(DEFAULT_LEFT_EYE_CENTER_MODEL)
         self.right_detector = EyeballDetector(DEFAULT_RIGHT_EYE_CENTER_MODEL)
+        self._length_coefficient = float(visualization_options.length_coefficient) if visualization_options else 5.0
+        self._left_gaze = np.empty(3, dtype=np.float32)
+        self._left_proj = np.empty(3, dtype=np.float32)
+        self._right_gaze = np.empty(3, dtype=np.float32)
+        self._right_proj = np.empty(3, dtype=np.float32)
+        self._eyes = (
+            (self.left_detector, LEFT_PUPIL, self._left_gaze, self._left_proj),
+            (self.right_detector, RIGHT_PUPIL, self._right_gaze, self._right_proj),
+        )
+        self._rgb = None
+        self._prev_at = None
+        self._prev_base_pts = None
+        self._frames_since_transform = 0
+        # Single-slot queue to the display thread, only the latest frame is ever shown
+        self._display_q = queue.Queue(maxsize=1)
+        self._stop = False
+        # HighGUI can run off the main thread with the Windows and Linux (GTK/Qt) backends, but the
+        # macOS Cocoa backend requires the main thread, so frames are shown inline there
+        self._threaded_display = sys.platform != 'darwin'
         self.options = FaceLandmarkerOptions(
             base_options=BaseOptions(model_asset_path=model_path),
             running_mode=VisionRunningMode.VIDEO
         )
+        # Worker pools exist only while start() runs
+        self._executor = None
+        self._fit_pool = None
 
     async def start(self):
         """
         Starts the video processing loop to detect facial landmarks and calculate gaze vectors.
         Continuously updates the video display and invokes callback with gaze data.
+        Blocking capture and per-frame inference run on a worker thread so the event loop stays responsive.
+        On Windows and Linux frames are displayed by a separate thread so rendering never stalls detection;
+        on macOS, where HighGUI must stay on the main thread, they are displayed inline.
         """
-        with FaceLandmarker.create_from_options(self.options) as landmarker:
-            cap = cv2.VideoCapture(self.camera_idx)
-            width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
-            height = cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
+        loop = asyncio.get_running_loop()
+        self._stop = False
+        display_thread = None
+        window_shown = False
+        cap = None
+        # A single worker keeps frames ordered for detect_for_video; OpenCV is limited to one
+        # thread so it doesn't oversubscribe cores alongside MediaPipe's own threads
+        self._executor = ThreadPoolExecutor(max_workers=1, initializer=cv2.setNumThreads, initargs=(1,))
+        # Left and right eyeball fits are independent and run concurrently
+        self._fit_pool = ThreadPoolExecutor(max_workers=2)
+        try:
+            with FaceLandmarker.create_from_options(self.options) as landmarker:
+                if self._threaded_display:
+                    display_thread = threading.Thread(target=self._display_worker, daemon=True)
+                    display_thread.start()
+                cap = cv2.VideoCapture(self.camera_idx)
 
-            while cap.isOpened():
-                success, frame = cap.read()
-                if not success:
-                    print("Ignoring empty camera frame.")
-                    continue
+                while cap.isOpened() and not self._stop:
+                    success, frame = await loop.run_in_executor(self._executor, cap.read)
+                    if not success:
+                        print("Ignoring empty camera frame.")
+                        continue
 
-                timestamp_ms = int(time.time() * 1000)
-                mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame)
+                    timestamp_ms = time.monotonic_ns() // 1_000_000
+                    left_gaze_vector, right_gaze_vector, frame = await loop.run_in_executor(
+                        self._executor, self._process_frame, landmarker, frame, timestamp_ms)
 
-                face_landmarker_result = landmarker.detect_for_video(mp_image, timestamp_ms)
+                    if self.callback and (left_gaze_vector is not None or right_gaze_vector is not None):
+                        await self.callback(left_gaze_vector, right_gaze_vector)
 
-                if face_landmarker_result.face_landmarks:
-                    lms_s = np.array([[lm.x, lm.y, lm.z] for lm in face_landmarker_result.face_landmarks[0]])
-                    lms_2 = (lms_s[:, :2] * [frame.shape[1], frame.shape[0]]).round().astype(int)
+                    if display_thread is not None:
+                        self._show(frame)
+                    else:
+                        cv2.imshow('LaserGaze', frame)
+                        window_shown = True
+                        if cv2.waitKey(5) & 0xFF == 27:
+                            break
+        finally:
+            # Stop and join the display thread on any exit, it destroys its own window
+            self._stop = True
+            # Let an in-flight read or frame finish before the camera is released
+            self._executor.shutdown()
+            self._fit_pool.shutdown()
+            self._executor = None
+            self._fit_pool = None
+            if cap is not None:
+                cap.release()
+            if display_thread is not None:
+                display_thread.join()
+            elif window_shown:
+                cv2.destroyWindow('LaserGaze')
+            try:
+                self._display_q.get_nowait()
+            except queue.Empty:
+                pass
 
-                    mp_hor_pts = [lms_s[i] for i in OUTER_HEAD_POINTS]
-                    mp_ver_pts = [lms_s[i] for i in [NOSE_BRIDGE, NOSE_TIP]]
-                    model_hor_pts = OUTER_HEAD_POINTS_MODEL
-                    model_ver_pts = [NOSE_BRIDGE_MODEL, NOSE_TIP_MODEL]
+    def _show(self, frame):
+        """
+        Hands a frame to the display thread without blocking, replacing a frame that hasn't been shown yet.
 
-                    at = AffineTransformer(lms_s[BASE_LANDMARKS,:], BASE_FACE_MODEL, mp_hor_pts, mp_ver_pts, model_hor_pts, model_ver_pts)
+        Args:
+        - frame (np.array): Frame to display.
+        """
+        try:
+            self._display_q.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self._display_q.put_nowait(frame)
+        except queue.Full:
+            pass
 
-                    indices_for_left_eye_center_detection = LEFT_IRIS + ADJACENT_LEFT_EYELID_PART
-                    left_eye_iris_points = lms_s[indices_for_left_eye_center_detection, :]
-                    left_eye_iris_points_in_model_space = [at.to_m2(mpp) for mpp in left_eye_iris_points]
-                    self.left_detector.update(left_eye_iris_points_in_model_space, timestamp_ms)
+    def _display_worker(self):
+        """
+        Shows frames from the display queue until the processing stops or ESC is pressed,
+        then destroys the window from this same thread.
+        """
+        window_shown = False
+        while not self._stop:
+            try:
+                frame = self._display_q.get(timeout=0.1)
+            except queue.Empty:
+                # Keep the window responsive and ESC detectable while no frames arrive
+                if window_shown and cv2.waitKey(1) & 0xFF == 27:
+                    self._stop = True
+                continue
+            cv2.imshow('LaserGaze', frame)
+            window_shown = True
+            if cv2.waitKey(1) & 0xFF == 27:
+                self._stop = True
+        if window_shown:
+            cv2.destroyWindow('LaserGaze')
 
-                    indices_for_right_eye_center_detection = RIGHT_IRIS + ADJACENT_RIGHT_EYELID_PART
-                    right_eye_iris_points = lms_s[indices_for_right_eye_center_detection, :]
-                    right_eye_iris_points_in_model_space = [at.to_m2(mpp) for mpp in right_eye_iris_points]
-                    self.right_detector.update(right_eye_iris_points_in_model_space, timestamp_ms)
+    def _get_transformer(self, lms_s):
+        """
+        Returns the affine transformer for the current head pose, reusing the previous one while the head is still.
 
-                    left_gaze_vector, right_gaze_vector = None, None
+        Args:
+        - lms_s (np.array): Normalized facial landmarks of the current frame.
 
-                    if self.left_detector.center_detected: #and self.right_detector.center_detected
-                        left_eyeball_center = at.to_m1(self.left_detector.eye_center)
-                        left_pupil = lms_s[LEFT_PUPIL]
-                        left_gaze_vector = left_pupil - left_eyeball_center
-                        left_proj_point = left_pupil + left_gaze_vector*5.0
+        Returns:
+        - AffineTransformer: Transformer between the landmarks space and the face model space.
+        """
+        base_pts = lms_s[BASE_LANDMARKS_IDX]
+        self._frames_since_transform += 1
+        if (self._prev_at is not None
+                and self._frames_since_transform < TRANSFORM_REFRESH_FRAMES
+                and np.max(np.abs(base_pts - self._prev_base_pts)) < HEAD_POSE_EPSILON):
+            return self._prev_at
 
-                    if self.right_detector.center_detected:
-                        right_eyeball_center = at.to_m1(self.right_detector.eye_center)
-                        right_pupil = lms_s[RIGHT_PUPIL]
-                        right_gaze_vector = right_pupil - right_eyeball_center
-                        right_proj_point = right_pupil + right_gaze_vector*5.0
+        mp_hor_pts = [lms_s[i] for i in OUTER_HEAD_POINTS]
+        mp_ver_pts = [lms_s[i] for i in [NOSE_BRIDGE, NOSE_TIP]]
+        model_hor_pts = OUTER_HEAD_POINTS_MODEL
+        model_ver_pts = [NOSE_BRIDGE_MODEL, NOSE_TIP_MODEL]
 
-                    if self.callback and (left_gaze_vector is not None or right_gaze_vector is not None):
-                        await self.callback(left_gaze_vector, right_gaze_vector)
+        self._prev_at = AffineTransformer(base_pts, BASE_FACE_MODEL, mp_hor_pts, mp_ver_pts, model_hor_pts, model_ver_pts)
+        self._prev_base_pts = base_pts
+        self._frames_since_transform = 0
+        return self._prev_at
+
+    def _process_frame(self, landmarker, frame, timestamp_ms):
+        """
+        Detects facial landmarks on a single frame, updates the eyeball detectors and calculates gaze vectors.
+
+        Args:
+        - landmarker (FaceLandmarker): MediaPipe face landmarker running in video mode.
+        - frame (np.array): BGR video frame.
+        - timestamp_ms (int): The frame's timestamp in milliseconds.
+
+        Returns:
+        - tuple: Left and right gaze vectors (None if not yet available) and the frame with visualizations applied.
+        """
+        left_gaze_vector, right_gaze_vector = None, None
+
+        # OpenCV captures BGR while MediaPipe expects RGB; convert into a reused buffer
+        if self._rgb is None or self._rgb.shape != frame.shape:
+            self._rgb = np.empty_like(frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=self._rgb)
+
+        face_landmarker_result = landmarker.detect_for_video(mp_image, timestamp_ms)
+
+        if face_landmarker_result.face_landmarks:
+            face_landmarks = face_landmarker_result.face_landmarks[0]
+            lms_s = np.fromiter((v for lm in face_landmarks for v in (lm.x, lm.y, lm.z)),
+                                dtype=np.float32, count=3 * len(face_landmarks)).reshape(-1, 3)
+
+            at = self._get_transformer(lms_s)
+
+            detectors = (self.left_detector, self.right_detector)
+
+            # Once both eyeballs are calibrated the detectors ignore new points,
+            # so only the mapping of the cached centers back to image space is needed
+            if not all(detector.search_completed for detector in detectors):
+                # Both eyes go through a single batched transform and are split into disjoint views
+                eyes_points_in_model_space = at.to_m2_batch(lms_s[EYES_DET_IDX])
+                eyes_points = np.split(eyes_points_in_model_space, [len(LEFT_EYE_DET_IDX)])
+
+                # The detectors share no state, and NumPy/LAPACK release the GIL during the sphere fit
+                futures = [self._fit_pool.submit(detector.update, points, timestamp_ms)
+                           for detector, points in zip(detectors, eyes_points)]
+                for future in futures:
+                    future.result()
+
+            gaze_vectors, gaze_lines = [], []
+            for detector, pupil_idx, gaze, proj in self._eyes:
+                gaze_vector = None
+                if detector.center_detected:
+                    eyeball_center = at.to_m1(detector.eye_center)
+                    pupil = lms_s[pupil_idx]
+                    _gaze_and_proj(pupil, eyeball_center, self._length_coefficient, gaze, proj)
+                    gaze_vector = gaze.copy()  # Handed to the callback, so it must not alias the scratch buffer
+                    gaze_lines.append((pupil, proj))
+                gaze_vectors.append(gaze_vector)
+            left_gaze_vector, right_gaze_vector = gaze_vectors
+
+            if self.vis_options:
+                if all(detector.center_detected for detector in detectors):
+                    for pupil, proj_point in gaze_lines:
+                        p1 = relative(pupil[:2], frame.shape)
+                        p2 = relative(proj_point[:2], frame.shape)
+                        frame = cv2.line(frame, p1, p2, self.vis_options.color, self.vis_options.line_thickness)
+                else:
+                    text_location = (10, frame.shape[0] - 10)
+                    cv2.putText(frame, "Calibration...", text_location, cv2.FONT_HERSHEY_SIMPLEX, 0.5, self.vis_options.color, 2)
 
-                    if self.vis_options:
-                        if self.left_detector.center_detected and self.right_detector.center_detected:
-                            p1 = relative(left_pupil[:2], frame.shape)
-                            p2 = relative(left_proj_point[:2], frame.shape)
-                            frame = cv2.line(frame, p1, p2, self.vis_options.color, self.vis_options.line_thickness)
-                            p1 = relative(right_pupil[:2], frame.shape)
-                            p2 = relative(right_proj_point[:2], frame.shape)
-                            frame = cv2.line(frame, p1, p2, self.vis_options.color, self.vis_options.line_thickness)
-                        else:
-                            text_location = (10, frame.shape[0] - 10)
-                            cv2.putText(frame, "Calibration...", text_location, cv2.FONT_HERSHEY_SIMPLEX, 0.5, self.vis_options.color, 2)
-
-
-                cv2.imshow('LaserGaze', frame)
-                if cv2.waitKey(5) & 0xFF == 27:
-                    break
\ No newline at end of file
+        return left_gaze_vector, right_gaze_vector, frame
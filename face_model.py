@@ -11,36 +11,37 @@
 
 import numpy as np
 
-INTERNAL_EYES_CORNERS_MODEL = np.array([
+INTERNAL_EYES_CORNERS_MODEL = np.ascontiguousarray([
     [-0.035, -0.05, 0],
     [0.035, -0.05, 0]
-])
+], dtype=np.float32)
 
-OUTER_EYES_CORNERS_MODEL = np.array([
+OUTER_EYES_CORNERS_MODEL = np.ascontiguousarray([
     [-0.09, -0.057, 0.01],
     [0.09, -0.057, 0.01]
-])
+], dtype=np.float32)
 
-OUTER_HEAD_POINTS_MODEL = np.array([
+OUTER_HEAD_POINTS_MODEL = np.ascontiguousarray([
     [-0.145, -0.1, 0.1],
     [0.145, -0.1, 0.1]
-])
+], dtype=np.float32)
 
-NOSE_BRIDGE_MODEL = np.array([
+NOSE_BRIDGE_MODEL = np.ascontiguousarray([
     [0, -0.0319, -0.0432]
-])
+], dtype=np.float32)
 
-NOSE_TIP_MODEL = np.array([
+NOSE_TIP_MODEL = np.ascontiguousarray([
     [0, 0.088, -0.071]
-])
+], dtype=np.float32)
 
-BASE_FACE_MODEL = np.vstack((
+BASE_FACE_MODEL = np.ascontiguousarray(np.vstack((
     INTERNAL_EYES_CORNERS_MODEL,
     OUTER_EYES_CORNERS_MODEL,
     OUTER_HEAD_POINTS_MODEL,
     NOSE_BRIDGE_MODEL,
     NOSE_TIP_MODEL
-))
+)), dtype=np.float32)
+assert BASE_FACE_MODEL.flags['C_CONTIGUOUS']
 
 DEFAULT_LEFT_EYE_CENTER_MODEL = (np.array(INTERNAL_EYES_CORNERS_MODEL[0]) + np.array(OUTER_EYES_CORNERS_MODEL[0])) * 0.5
 DEFAULT_LEFT_EYE_CENTER_MODEL[1] -= 0.009
@@ -14,6 +14,8 @@
 # Author: Sergey Kuldin
 # -----------------------------------------------------------------------------------
 
+import numpy as np
+
 OUTER_HEAD_POINTS = [162, 389]
 NOSE_BRIDGE = 6
 NOSE_TIP = 4
@@ -32,5 +34,11 @@ ADJACENT_RIGHT_EYELID_PART = [387, 386, 385, 390, 373, 374, 380]
 
 BASE_LANDMARKS = INTERNAL_EYES_CORNERS + OUTER_EYES_CORNERS + OUTER_HEAD_POINTS + [NOSE_BRIDGE] + [NOSE_TIP]
 
+# Precomputed index arrays for per-frame fancy indexing of the landmarks array
+BASE_LANDMARKS_IDX = np.array(BASE_LANDMARKS, dtype=np.int32)
+LEFT_EYE_DET_IDX = np.array(LEFT_IRIS + ADJACENT_LEFT_EYELID_PART, dtype=np.int32)
+RIGHT_EYE_DET_IDX = np.array(RIGHT_IRIS + ADJACENT_RIGHT_EYELID_PART, dtype=np.int32)
+EYES_DET_IDX = np.concatenate((LEFT_EYE_DET_IDX, RIGHT_EYE_DET_IDX))
+
 relative = lambda landmark, shape: (int(landmark[0] * shape[1]), int(landmark[1] * shape[0]))
 relativeT = lambda landmark, shape: (int(landmark[0] * shape[1]), int(landmark[1] * shape[0]), 0)
\ No newline at end of file